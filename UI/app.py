@@ -4,12 +4,23 @@ Author: Shivam Dubey
 Description: Web interface for banking operations
 """
 
-from flask import Flask, render_template, request, jsonify, redirect, url_for, flash
-import cx_Oracle
+from flask import Flask, render_template, request, redirect, url_for, flash
+import oracledb
+import orjson
+import hashlib
+import math
+import numpy as np
 import os
-from datetime import datetime
+import threading
+from contextlib import contextmanager
+from cachetools import TTLCache
+from pydantic import ValidationError
 import logging
-from config import config
+from logging.handlers import QueueHandler, QueueListener
+import queue
+import atexit
+from config import config, Config
+from schemas import CustomerIn, AccountIn, TransactionIn, TransferIn, LoanIn, LoanQuery, invalid_fields
 
 # Create Flask app with configuration
 def create_app(config_name=None):
@@ -24,25 +35,230 @@ def create_app(config_name=None):
 app = create_app()
 
 # Database configuration from config class
-DB_CONFIG = app.config['Config'].get_db_config() if hasattr(app.config, 'Config') else {
-    'user': os.environ.get('DB_USER', 'your_username'),
-    'password': os.environ.get('DB_PASSWORD', 'your_password'),
-    'dsn': f"{os.environ.get('DB_HOST', 'localhost')}:{os.environ.get('DB_PORT', '1521')}/{os.environ.get('DB_SERVICE', 'XE')}"
-}
-
-# Configure logging
-logging.basicConfig(level=logging.INFO)
+DB_CONFIG = Config.get_db_config()
+
+# Configure logging; records are queued and written to the stream by a background thread
+log_queue = queue.SimpleQueue()
+log_listener = QueueListener(log_queue, logging.StreamHandler())
+log_listener.start()
+atexit.register(log_listener.stop)
+logging.basicConfig(level=logging.INFO, handlers=[QueueHandler(log_queue)])
 logger = logging.getLogger(__name__)
 
+# Thin mode talks to the database directly but needs Oracle Database 12.1 or later;
+# older databases need thick mode through the Oracle Client libraries
+if app.config['ORACLE_CLIENT_LIB']:
+    oracledb.init_oracle_client(lib_dir=app.config['ORACLE_CLIENT_LIB'])
+
+def create_pool():
+    """Create the session pool shared by all requests"""
+    try:
+        return oracledb.create_pool(
+            user=DB_CONFIG['user'],
+            password=DB_CONFIG['password'],
+            dsn=DB_CONFIG['dsn'],
+            min=app.config['POOL_MIN'],
+            max=app.config['POOL_MAX'],
+            increment=app.config['POOL_INCREMENT'],
+            timeout=app.config['POOL_TIMEOUT'],
+            getmode=oracledb.POOL_GETMODE_WAIT,
+            stmtcachesize=app.config['STMT_CACHE_SIZE']
+        )
+    except oracledb.Error as e:
+        logger.error(f"Session pool creation error: {e}")
+        return None
+
+POOL = create_pool()
+POOL_LOCK = threading.Lock()
+
+# Dashboard statistics are polled by the UI, so serve them from a short-lived cache
+STATS_CACHE = TTLCache(maxsize=1, ttl=app.config['STATS_CACHE_TTL'])
+
+# Dropdown lookups change rarely compared to page views
+CUSTOMERS_CACHE = TTLCache(maxsize=1, ttl=app.config['CUSTOMERS_CACHE_TTL'])
+ACCOUNT_TYPES_CACHE = TTLCache(maxsize=1, ttl=app.config['ACCOUNT_TYPES_CACHE_TTL'])
+CACHE_LOCK = threading.Lock()
+
+class SQL:
+    """Statements issued by the views, kept as constants so the text is identical on every call"""
+    CUSTOMERS_LIST = """
+        SELECT customer_id, first_name, last_name, email, phone, 
+               address, date_of_birth, created_date, status
+        FROM CUSTOMERS 
+        ORDER BY created_date DESC
+    """
+    
+    ACCOUNTS_LIST = """
+        SELECT a.account_id, a.account_number, 
+               c.first_name || ' ' || c.last_name as customer_name,
+               at.type_name, a.balance, a.opened_date, a.status
+        FROM ACCOUNTS a
+        JOIN CUSTOMERS c ON a.customer_id = c.customer_id
+        JOIN ACCOUNT_TYPES at ON a.account_type_id = at.type_id
+        ORDER BY a.opened_date DESC
+    """
+    
+    ACTIVE_CUSTOMERS = "SELECT customer_id, first_name || ' ' || last_name as name FROM CUSTOMERS WHERE status = 'ACTIVE'"
+    
+    ACCOUNT_TYPES = "SELECT type_id, type_name, min_balance FROM ACCOUNT_TYPES"
+    
+    TRANSACTIONS_LIST = """
+        SELECT th.transaction_id, th.account_id, a.account_number,
+               th.transaction_type, th.amount, th.balance_after,
+               th.description, th.transaction_date
+        FROM TRANSACTION_HISTORY th
+        JOIN ACCOUNTS a ON th.account_id = a.account_id
+        ORDER BY th.transaction_date DESC
+        FETCH FIRST 50 ROWS ONLY
+    """
+    
+    ACCOUNTS_DROPDOWN = """
+        SELECT a.account_id, a.account_number || ' (' || c.first_name || ' ' || c.last_name || ')' as display_name
+        FROM ACCOUNTS a
+        JOIN CUSTOMERS c ON a.customer_id = c.customer_id
+        WHERE a.status = 'ACTIVE'
+        ORDER BY a.account_number
+    """
+    
+    LOANS_LIST = """
+        SELECT l.loan_id, c.first_name || ' ' || c.last_name as customer_name,
+               l.loan_type, l.principal_amount, l.interest_rate, l.tenure_months,
+               l.emi_amount, l.outstanding_balance, l.application_date, l.status
+        FROM LOANS l
+        JOIN CUSTOMERS c ON l.customer_id = c.customer_id
+        ORDER BY l.application_date DESC
+    """
+    
+    RECENT_TRANSACTIONS = """
+        SELECT th.transaction_id, th.account_id, a.account_number,
+               th.transaction_type, th.amount, th.balance_after,
+               th.description, th.transaction_date
+        FROM TRANSACTION_HISTORY th
+        JOIN ACCOUNTS a ON th.account_id = a.account_id
+        ORDER BY th.transaction_date DESC
+        FETCH FIRST 20 ROWS ONLY
+    """
+    
+    DASHBOARD_STATS = """
+        SELECT (SELECT COUNT(*) FROM CUSTOMERS WHERE status = 'ACTIVE'),
+               (SELECT COUNT(*) FROM ACCOUNTS WHERE status = 'ACTIVE'),
+               (SELECT NVL(SUM(balance), 0) FROM ACCOUNTS WHERE status = 'ACTIVE'),
+               (SELECT COUNT(*) FROM LOANS WHERE status IN ('APPROVED', 'DISBURSED')),
+               (SELECT COUNT(*) FROM TRANSACTION_HISTORY
+                WHERE transaction_date >= TRUNC(SYSDATE))
+        FROM DUAL
+    """
+    
+    # Row: (first_name, last_name, email, phone, address, date_of_birth);
+    # :7 is the OUT customer_id bound by bulk_add_customers
+    BULK_ADD_CUSTOMER = "BEGIN pkg_customer_mgmt.add_customer(:1, :2, :3, :4, :5, :6, :7); END;"
+    
+    # Row: (account_id, amount, description)
+    BULK_DEPOSIT = "BEGIN pkg_account_mgmt.deposit_money(:1, :2, :3); END;"
+
 def get_db_connection():
-    """Get database connection"""
+    """Get database connection from the session pool"""
+    global POOL
+    if POOL is None:
+        # Retry pool creation in case the database was unavailable at startup;
+        # the lock stops concurrent first requests from each building a pool
+        with POOL_LOCK:
+            if POOL is None:
+                POOL = create_pool()
+        if POOL is None:
+            return None
+    
     try:
-        connection = cx_Oracle.connect(**DB_CONFIG)
+        connection = POOL.acquire()
         return connection
-    except cx_Oracle.Error as e:
+    except oracledb.Error as e:
         logger.error(f"Database connection error: {e}")
         return None
 
+@contextmanager
+def db_cursor(conn):
+    """Use a cursor on a pooled connection, releasing both even if a statement fails"""
+    try:
+        cursor = conn.cursor()
+        try:
+            yield cursor
+        except Exception:
+            # The banking procedures commit their own work; this only makes sure a
+            # failed statement never hands a half-done transaction back to the pool
+            try:
+                conn.rollback()
+            except oracledb.Error as e:
+                # Keep the original error; the session itself may be what failed
+                logger.error(f"Rollback error: {e}")
+            raise
+        finally:
+            cursor.close()
+    finally:
+        POOL.release(conn)
+
+def set_fetch_size(cursor, rows=None):
+    """Size the cursor fetch buffers so a result set needs few round-trips"""
+    cursor.arraysize = rows or app.config['FETCH_ARRAY_SIZE']
+    # One extra prefetched row lets the driver detect the end of the result set
+    cursor.prefetchrows = cursor.arraysize + 1
+
+def cached_query(cache, cursor, sql):
+    """Run a lookup query, reusing rows cached by an earlier request"""
+    with CACHE_LOCK:
+        rows = cache.get(sql)
+    if rows is None:
+        cursor.execute(sql)
+        rows = cursor.fetchall()
+        with CACHE_LOCK:
+            cache[sql] = rows
+    return rows
+
+def bulk_add_customers(rows):
+    """Add many customers in one round-trip.
+    
+    Each row is (first_name, last_name, email, phone, address, date_of_birth).
+    Returns the new customer IDs in row order. The procedure commits each row
+    itself, so if a row fails the rows before it stay added.
+    """
+    conn = get_db_connection()
+    if not conn:
+        raise RuntimeError('Database connection failed')
+    
+    try:
+        with db_cursor(conn) as cursor:
+            customer_ids = cursor.var(oracledb.NUMBER, arraysize=len(rows))
+            cursor.setinputsizes(50, 50, 100, 15, 200, oracledb.DATETIME, customer_ids)
+            cursor.executemany(SQL.BULK_ADD_CUSTOMER, rows)
+            return [int(customer_ids.getvalue(i)) for i in range(len(rows))]
+    finally:
+        # A partly applied batch has still added customers
+        with CACHE_LOCK:
+            CUSTOMERS_CACHE.clear()
+
+def bulk_deposit(rows):
+    """Process many deposits in one round-trip.
+    
+    Each row is (account_id, amount, description). As with bulk_add_customers,
+    deposits before a failing row stay applied.
+    """
+    conn = get_db_connection()
+    if not conn:
+        raise RuntimeError('Database connection failed')
+    
+    with db_cursor(conn) as cursor:
+        cursor.setinputsizes(oracledb.NUMBER, oracledb.NUMBER, 200)
+        cursor.executemany(SQL.BULK_DEPOSIT, rows)
+
+def ojsonify(obj):
+    """Serialize an object to a JSON response using orjson"""
+    return app.response_class(orjson.dumps(obj), mimetype='application/json')
+
+def conditional_json(body):
+    """Build a JSON response from encoded bytes, answering 304 if the client copy is current"""
+    response = app.response_class(body, mimetype='application/json')
+    response.set_etag(hashlib.blake2b(body, digest_size=16).hexdigest())
+    return response.make_conditional(request)
+
 @app.route('/')
 def index():
     """Home page"""
@@ -57,19 +273,13 @@ def customers():
         return render_template('customers.html', customers=[])
     
     try:
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT customer_id, first_name, last_name, email, phone, 
-                   address, date_of_birth, created_date, status
-            FROM CUSTOMERS 
-            ORDER BY created_date DESC
-        """)
-        customers = cursor.fetchall()
-        cursor.close()
-        conn.close()
+        with db_cursor(conn) as cursor:
+            set_fetch_size(cursor)
+            cursor.execute(SQL.CUSTOMERS_LIST)
+            customers = cursor.fetchall()
         
         return render_template('customers.html', customers=customers)
-    except cx_Oracle.Error as e:
+    except oracledb.Error as e:
         logger.error(f"Error fetching customers: {e}")
         flash('Error fetching customer data', 'error')
         return render_template('customers.html', customers=[])
@@ -77,30 +287,37 @@ def customers():
 @app.route('/add_customer', methods=['POST'])
 def add_customer():
     """Add new customer"""
+    try:
+        data = CustomerIn.model_validate(request.form.to_dict())
+    except ValidationError as e:
+        flash(f'Invalid customer details: {invalid_fields(e)}', 'error')
+        return redirect(url_for('customers'))
+    
     conn = get_db_connection()
     if not conn:
         flash('Database connection failed', 'error')
         return redirect(url_for('customers'))
     
     try:
-        cursor = conn.cursor()
-        customer_id = cursor.var(cx_Oracle.NUMBER)
-        
-        cursor.callproc('pkg_customer_mgmt.add_customer', [
-            request.form['first_name'],
-            request.form['last_name'],
-            request.form['email'],
-            request.form['phone'],
-            request.form['address'],
-            datetime.strptime(request.form['date_of_birth'], '%Y-%m-%d'),
-            customer_id
-        ])
-        
-        cursor.close()
-        conn.close()
+        with db_cursor(conn) as cursor:
+            customer_id = cursor.var(oracledb.NUMBER)
+            
+            cursor.callproc('pkg_customer_mgmt.add_customer', [
+                data.first_name,
+                data.last_name,
+                data.email,
+                data.phone,
+                data.address,
+                data.date_of_birth,
+                customer_id
+            ])
+        
+        # The new customer must show up in dropdowns straight away
+        with CACHE_LOCK:
+            CUSTOMERS_CACHE.clear()
         
         flash(f'Customer added successfully with ID: {customer_id.getvalue()}', 'success')
-    except cx_Oracle.Error as e:
+    except oracledb.Error as e:
         logger.error(f"Error adding customer: {e}")
         flash(f'Error adding customer: {str(e)}', 'error')
     
@@ -115,33 +332,21 @@ def accounts():
         return render_template('accounts.html', accounts=[], customers=[], account_types=[])
     
     try:
-        cursor = conn.cursor()
-        
-        # Get accounts with customer and type information
-        cursor.execute("""
-            SELECT a.account_id, a.account_number, 
-                   c.first_name || ' ' || c.last_name as customer_name,
-                   at.type_name, a.balance, a.opened_date, a.status
-            FROM ACCOUNTS a
-            JOIN CUSTOMERS c ON a.customer_id = c.customer_id
-            JOIN ACCOUNT_TYPES at ON a.account_type_id = at.type_id
-            ORDER BY a.opened_date DESC
-        """)
-        accounts = cursor.fetchall()
-        
-        # Get customers for dropdown
-        cursor.execute("SELECT customer_id, first_name || ' ' || last_name as name FROM CUSTOMERS WHERE status = 'ACTIVE'")
-        customers = cursor.fetchall()
-        
-        # Get account types
-        cursor.execute("SELECT type_id, type_name, min_balance FROM ACCOUNT_TYPES")
-        account_types = cursor.fetchall()
-        
-        cursor.close()
-        conn.close()
+        with db_cursor(conn) as cursor:
+            set_fetch_size(cursor)
+            
+            # Get accounts with customer and type information
+            cursor.execute(SQL.ACCOUNTS_LIST)
+            accounts = cursor.fetchall()
+            
+            # Get customers for dropdown
+            customers = cached_query(CUSTOMERS_CACHE, cursor, SQL.ACTIVE_CUSTOMERS)
+            
+            # Get account types
+            account_types = cached_query(ACCOUNT_TYPES_CACHE, cursor, SQL.ACCOUNT_TYPES)
         
         return render_template('accounts.html', accounts=accounts, customers=customers, account_types=account_types)
-    except cx_Oracle.Error as e:
+    except oracledb.Error as e:
         logger.error(f"Error fetching accounts: {e}")
         flash('Error fetching account data', 'error')
         return render_template('accounts.html', accounts=[], customers=[], account_types=[])
@@ -149,27 +354,30 @@ def accounts():
 @app.route('/open_account', methods=['POST'])
 def open_account():
     """Open new account"""
+    try:
+        data = AccountIn.model_validate(request.form.to_dict())
+    except ValidationError as e:
+        flash(f'Invalid account details: {invalid_fields(e)}', 'error')
+        return redirect(url_for('accounts'))
+    
     conn = get_db_connection()
     if not conn:
         flash('Database connection failed', 'error')
         return redirect(url_for('accounts'))
     
     try:
-        cursor = conn.cursor()
-        account_id = cursor.var(cx_Oracle.NUMBER)
-        
-        cursor.callproc('pkg_account_mgmt.open_account', [
-            int(request.form['customer_id']),
-            int(request.form['account_type_id']),
-            float(request.form['initial_deposit']),
-            account_id
-        ])
-        
-        cursor.close()
-        conn.close()
+        with db_cursor(conn) as cursor:
+            account_id = cursor.var(oracledb.NUMBER)
+            
+            cursor.callproc('pkg_account_mgmt.open_account', [
+                data.customer_id,
+                data.account_type_id,
+                data.initial_deposit,
+                account_id
+            ])
         
         flash(f'Account opened successfully with ID: {account_id.getvalue()}', 'success')
-    except cx_Oracle.Error as e:
+    except oracledb.Error as e:
         logger.error(f"Error opening account: {e}")
         flash(f'Error opening account: {str(e)}', 'error')
     
@@ -184,35 +392,19 @@ def transactions():
         return render_template('transactions.html', transactions=[], accounts=[])
     
     try:
-        cursor = conn.cursor()
-        
-        # Get recent transactions
-        cursor.execute("""
-            SELECT th.transaction_id, th.account_id, a.account_number,
-                   th.transaction_type, th.amount, th.balance_after,
-                   th.description, th.transaction_date
-            FROM TRANSACTION_HISTORY th
-            JOIN ACCOUNTS a ON th.account_id = a.account_id
-            ORDER BY th.transaction_date DESC
-            FETCH FIRST 50 ROWS ONLY
-        """)
-        transactions = cursor.fetchall()
-        
-        # Get active accounts for dropdowns
-        cursor.execute("""
-            SELECT a.account_id, a.account_number || ' (' || c.first_name || ' ' || c.last_name || ')' as display_name
-            FROM ACCOUNTS a
-            JOIN CUSTOMERS c ON a.customer_id = c.customer_id
-            WHERE a.status = 'ACTIVE'
-            ORDER BY a.account_number
-        """)
-        accounts = cursor.fetchall()
-        
-        cursor.close()
-        conn.close()
+        with db_cursor(conn) as cursor:
+            # Get recent transactions
+            set_fetch_size(cursor, 50)
+            cursor.execute(SQL.TRANSACTIONS_LIST)
+            transactions = cursor.fetchall()
+            
+            # Get active accounts for dropdowns
+            set_fetch_size(cursor)
+            cursor.execute(SQL.ACCOUNTS_DROPDOWN)
+            accounts = cursor.fetchall()
         
         return render_template('transactions.html', transactions=transactions, accounts=accounts)
-    except cx_Oracle.Error as e:
+    except oracledb.Error as e:
         logger.error(f"Error fetching transactions: {e}")
         flash('Error fetching transaction data', 'error')
         return render_template('transactions.html', transactions=[], accounts=[])
@@ -220,24 +412,27 @@ def transactions():
 @app.route('/deposit', methods=['POST'])
 def deposit():
     """Process deposit"""
+    try:
+        data = TransactionIn.model_validate(request.form.to_dict())
+    except ValidationError as e:
+        flash(f'Invalid deposit details: {invalid_fields(e)}', 'error')
+        return redirect(url_for('transactions'))
+    
     conn = get_db_connection()
     if not conn:
         flash('Database connection failed', 'error')
         return redirect(url_for('transactions'))
     
     try:
-        cursor = conn.cursor()
-        cursor.callproc('pkg_account_mgmt.deposit_money', [
-            int(request.form['account_id']),
-            float(request.form['amount']),
-            request.form['description']
-        ])
-        
-        cursor.close()
-        conn.close()
+        with db_cursor(conn) as cursor:
+            cursor.callproc('pkg_account_mgmt.deposit_money', [
+                data.account_id,
+                data.amount,
+                data.description
+            ])
         
         flash('Deposit processed successfully', 'success')
-    except cx_Oracle.Error as e:
+    except oracledb.Error as e:
         logger.error(f"Error processing deposit: {e}")
         flash(f'Error processing deposit: {str(e)}', 'error')
     
@@ -246,24 +441,27 @@ def deposit():
 @app.route('/withdraw', methods=['POST'])
 def withdraw():
     """Process withdrawal"""
+    try:
+        data = TransactionIn.model_validate(request.form.to_dict())
+    except ValidationError as e:
+        flash(f'Invalid withdrawal details: {invalid_fields(e)}', 'error')
+        return redirect(url_for('transactions'))
+    
     conn = get_db_connection()
     if not conn:
         flash('Database connection failed', 'error')
         return redirect(url_for('transactions'))
     
     try:
-        cursor = conn.cursor()
-        cursor.callproc('pkg_account_mgmt.withdraw_money', [
-            int(request.form['account_id']),
-            float(request.form['amount']),
-            request.form['description']
-        ])
-        
-        cursor.close()
-        conn.close()
+        with db_cursor(conn) as cursor:
+            cursor.callproc('pkg_account_mgmt.withdraw_money', [
+                data.account_id,
+                data.amount,
+                data.description
+            ])
         
         flash('Withdrawal processed successfully', 'success')
-    except cx_Oracle.Error as e:
+    except oracledb.Error as e:
         logger.error(f"Error processing withdrawal: {e}")
         flash(f'Error processing withdrawal: {str(e)}', 'error')
     
@@ -272,25 +470,28 @@ def withdraw():
 @app.route('/transfer', methods=['POST'])
 def transfer():
     """Process fund transfer"""
+    try:
+        data = TransferIn.model_validate(request.form.to_dict())
+    except ValidationError as e:
+        flash(f'Invalid transfer details: {invalid_fields(e)}', 'error')
+        return redirect(url_for('transactions'))
+    
     conn = get_db_connection()
     if not conn:
         flash('Database connection failed', 'error')
         return redirect(url_for('transactions'))
     
     try:
-        cursor = conn.cursor()
-        cursor.callproc('pkg_account_mgmt.transfer_funds', [
-            int(request.form['from_account_id']),
-            int(request.form['to_account_id']),
-            float(request.form['amount']),
-            request.form['description']
-        ])
-        
-        cursor.close()
-        conn.close()
+        with db_cursor(conn) as cursor:
+            cursor.callproc('pkg_account_mgmt.transfer_funds', [
+                data.from_account_id,
+                data.to_account_id,
+                data.amount,
+                data.description
+            ])
         
         flash('Transfer processed successfully', 'success')
-    except cx_Oracle.Error as e:
+    except oracledb.Error as e:
         logger.error(f"Error processing transfer: {e}")
         flash(f'Error processing transfer: {str(e)}', 'error')
     
@@ -305,28 +506,18 @@ def loans():
         return render_template('loans.html', loans=[], customers=[])
     
     try:
-        cursor = conn.cursor()
-        
-        # Get loans with customer information
-        cursor.execute("""
-            SELECT l.loan_id, c.first_name || ' ' || c.last_name as customer_name,
-                   l.loan_type, l.principal_amount, l.interest_rate, l.tenure_months,
-                   l.emi_amount, l.outstanding_balance, l.application_date, l.status
-            FROM LOANS l
-            JOIN CUSTOMERS c ON l.customer_id = c.customer_id
-            ORDER BY l.application_date DESC
-        """)
-        loans = cursor.fetchall()
-        
-        # Get customers for dropdown
-        cursor.execute("SELECT customer_id, first_name || ' ' || last_name as name FROM CUSTOMERS WHERE status = 'ACTIVE'")
-        customers = cursor.fetchall()
-        
-        cursor.close()
-        conn.close()
+        with db_cursor(conn) as cursor:
+            set_fetch_size(cursor)
+            
+            # Get loans with customer information
+            cursor.execute(SQL.LOANS_LIST)
+            loans = cursor.fetchall()
+            
+            # Get customers for dropdown
+            customers = cached_query(CUSTOMERS_CACHE, cursor, SQL.ACTIVE_CUSTOMERS)
         
         return render_template('loans.html', loans=loans, customers=customers)
-    except cx_Oracle.Error as e:
+    except oracledb.Error as e:
         logger.error(f"Error fetching loans: {e}")
         flash('Error fetching loan data', 'error')
         return render_template('loans.html', loans=[], customers=[])
@@ -334,29 +525,32 @@ def loans():
 @app.route('/apply_loan', methods=['POST'])
 def apply_loan():
     """Apply for loan"""
+    try:
+        data = LoanIn.model_validate(request.form.to_dict())
+    except ValidationError as e:
+        flash(f'Invalid loan details: {invalid_fields(e)}', 'error')
+        return redirect(url_for('loans'))
+    
     conn = get_db_connection()
     if not conn:
         flash('Database connection failed', 'error')
         return redirect(url_for('loans'))
     
     try:
-        cursor = conn.cursor()
-        loan_id = cursor.var(cx_Oracle.NUMBER)
-        
-        cursor.callproc('pkg_loan_mgmt.apply_loan', [
-            int(request.form['customer_id']),
-            request.form['loan_type'],
-            float(request.form['principal_amount']),
-            float(request.form['interest_rate']),
-            int(request.form['tenure_months']),
-            loan_id
-        ])
-        
-        cursor.close()
-        conn.close()
+        with db_cursor(conn) as cursor:
+            loan_id = cursor.var(oracledb.NUMBER)
+            
+            cursor.callproc('pkg_loan_mgmt.apply_loan', [
+                data.customer_id,
+                data.loan_type,
+                data.principal_amount,
+                data.interest_rate,
+                data.tenure_months,
+                loan_id
+            ])
         
         flash(f'Loan application submitted with ID: {loan_id.getvalue()}', 'success')
-    except cx_Oracle.Error as e:
+    except oracledb.Error as e:
         logger.error(f"Error applying for loan: {e}")
         flash(f'Error applying for loan: {str(e)}', 'error')
     
@@ -372,130 +566,162 @@ def get_account_balance(account_id):
     """API endpoint to get account balance"""
     conn = get_db_connection()
     if not conn:
-        return jsonify({'error': 'Database connection failed'}), 500
+        return ojsonify({'error': 'Database connection failed'}), 500
     
     try:
-        cursor = conn.cursor()
-        balance = cursor.callfunc('get_account_balance', cx_Oracle.NUMBER, [account_id])
-        cursor.close()
-        conn.close()
+        with db_cursor(conn) as cursor:
+            balance = cursor.callfunc('get_account_balance', oracledb.NUMBER, [account_id])
         
-        return jsonify({'balance': float(balance)})
-    except cx_Oracle.Error as e:
+        return ojsonify({'balance': float(balance)})
+    except oracledb.Error as e:
         logger.error(f"Error getting balance: {e}")
-        return jsonify({'error': str(e)}), 400
+        return ojsonify({'error': str(e)}), 400
+
+def transaction_row(transaction_id, account_id, account_number, transaction_type,
+                    amount, balance_after, description, transaction_date):
+    """Row factory mapping a transaction row to its API representation"""
+    return {
+        'id': transaction_id,
+        'account_id': account_id,
+        'account_number': account_number,
+        'type': transaction_type,
+        'amount': amount,
+        'balance_after': balance_after,
+        'description': description,
+        'date': transaction_date
+    }
 
 @app.route('/api/recent_transactions')
 def get_recent_transactions():
     """API endpoint to get recent transactions"""
     conn = get_db_connection()
     if not conn:
-        return jsonify({'error': 'Database connection failed'}), 500
+        return ojsonify({'error': 'Database connection failed'}), 500
     
     try:
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT th.transaction_id, th.account_id, a.account_number,
-                   th.transaction_type, th.amount, th.balance_after,
-                   th.description, th.transaction_date
-            FROM TRANSACTION_HISTORY th
-            JOIN ACCOUNTS a ON th.account_id = a.account_id
-            ORDER BY th.transaction_date DESC
-            FETCH FIRST 20 ROWS ONLY
-        """)
-        transactions = cursor.fetchall()
-        cursor.close()
-        conn.close()
-        
-        # Convert to list of dictionaries
-        transaction_list = []
-        for t in transactions:
-            transaction_list.append({
-                'id': t[0],
-                'account_id': t[1],
-                'account_number': t[2],
-                'type': t[3],
-                'amount': float(t[4]),
-                'balance_after': float(t[5]),
-                'description': t[6],
-                'date': t[7].isoformat() if t[7] else None
-            })
-        
-        return jsonify({'transactions': transaction_list})
-    except cx_Oracle.Error as e:
+        with db_cursor(conn) as cursor:
+            set_fetch_size(cursor, 20)
+            cursor.execute(SQL.RECENT_TRANSACTIONS)
+            # Build each row as a dictionary while it is fetched
+            cursor.rowfactory = transaction_row
+            transactions = list(cursor)
+        
+        return conditional_json(orjson.dumps({'transactions': transactions}))
+    except oracledb.Error as e:
         logger.error(f"Error fetching transactions: {e}")
-        return jsonify({'error': str(e)}), 400
+        return ojsonify({'error': str(e)}), 400
 
 @app.route('/api/dashboard_stats')
 def get_dashboard_stats():
     """API endpoint to get dashboard statistics"""
+    # The encoded body is cached so cache hits skip serialization too
+    with CACHE_LOCK:
+        body = STATS_CACHE.get('stats')
+    if body is not None:
+        return conditional_json(body)
+    
     conn = get_db_connection()
     if not conn:
-        return jsonify({'error': 'Database connection failed'}), 500
+        return ojsonify({'error': 'Database connection failed'}), 500
     
     try:
-        cursor = conn.cursor()
-        
-        # Get customer count
-        cursor.execute("SELECT COUNT(*) FROM CUSTOMERS WHERE status = 'ACTIVE'")
-        customer_count = cursor.fetchone()[0]
-        
-        # Get account count
-        cursor.execute("SELECT COUNT(*) FROM ACCOUNTS WHERE status = 'ACTIVE'")
-        account_count = cursor.fetchone()[0]
+        with db_cursor(conn) as cursor:
+            # Gather all dashboard figures in a single round-trip
+            cursor.execute(SQL.DASHBOARD_STATS)
+            customer_count, account_count, total_balance, loan_count, daily_transactions = cursor.fetchone()
         
-        # Get total balance
-        cursor.execute("SELECT SUM(balance) FROM ACCOUNTS WHERE status = 'ACTIVE'")
-        total_balance = cursor.fetchone()[0] or 0
-        
-        # Get active loans count
-        cursor.execute("SELECT COUNT(*) FROM LOANS WHERE status IN ('APPROVED', 'DISBURSED')")
-        loan_count = cursor.fetchone()[0]
-        
-        # Get today's transactions
-        cursor.execute("""
-            SELECT COUNT(*) FROM TRANSACTION_HISTORY 
-            WHERE transaction_date >= TRUNC(SYSDATE)
-        """)
-        daily_transactions = cursor.fetchone()[0]
-        
-        cursor.close()
-        conn.close()
-        
-        return jsonify({
+        body = orjson.dumps({
             'customers': customer_count,
             'accounts': account_count,
             'total_balance': float(total_balance),
             'active_loans': loan_count,
             'daily_transactions': daily_transactions
         })
-    except cx_Oracle.Error as e:
+        with CACHE_LOCK:
+            STATS_CACHE['stats'] = body
+        
+        return conditional_json(body)
+    except oracledb.Error as e:
         logger.error(f"Error fetching dashboard stats: {e}")
-        return jsonify({'error': str(e)}), 400
+        return ojsonify({'error': str(e)}), 400
+
+def calculate_emi(principal, monthly_rate, tenure):
+    """Calculate the equated monthly instalment for a loan"""
+    # expm1/log1p give (1 + r) ** n - 1 without cancellation at small rates
+    growth = math.expm1(tenure * math.log1p(monthly_rate))
+    return principal * monthly_rate * (growth + 1) / growth
+
+def loan_terms():
+    """Validate the EMI calculator query parameters, returning them with the monthly rate and EMI"""
+    try:
+        query = LoanQuery.model_validate(request.args.to_dict())
+        monthly_rate = query.rate / (12 * 100)
+        # Extreme inputs can still overflow or zero the annuity factor
+        return query, monthly_rate, calculate_emi(query.principal, monthly_rate, query.tenure)
+    except (ValidationError, ArithmeticError):
+        return None
 
 @app.route('/api/calculate_emi')
 def calculate_emi_api():
     """API endpoint to calculate EMI"""
-    try:
-        principal = float(request.args.get('principal', 0))
-        rate = float(request.args.get('rate', 0))
-        tenure = int(request.args.get('tenure', 0))
-        
-        if principal <= 0 or rate <= 0 or tenure <= 0:
-            return jsonify({'error': 'Invalid parameters'}), 400
-        
-        monthly_rate = rate / (12 * 100)
-        emi = principal * monthly_rate * (1 + monthly_rate) ** tenure / ((1 + monthly_rate) ** tenure - 1)
-        total_amount = emi * tenure
-        total_interest = total_amount - principal
-        
-        return jsonify({
+    terms = loan_terms()
+    if terms is None:
+        return ojsonify({'error': 'Invalid parameters'}), 400
+    query, monthly_rate, emi = terms
+    
+    total_amount = emi * query.tenure
+    total_interest = total_amount - query.principal
+    
+    return ojsonify({
+        'emi': round(emi, 2),
+        'total_amount': round(total_amount, 2),
+        'total_interest': round(total_interest, 2)
+    })
+
+@app.route('/api/amortization_schedule')
+def amortization_schedule_api():
+    """API endpoint to get the month-by-month repayment schedule of a loan"""
+    terms = loan_terms()
+    if terms is None:
+        return ojsonify({'error': 'Invalid parameters'}), 400
+    query, monthly_rate, emi = terms
+    principal, tenure = query.principal, query.tenure
+    
+    # Closed-form balances for every month in one vectorized pass. The balance is
+    # written as P * (G^N - G^n) / (G^N - 1), which unlike P * G^n - EMI * (G^n - 1) / r
+    # never subtracts two huge, nearly equal numbers at long tenures.
+    growth = np.expm1(np.arange(1, tenure + 1) * np.log1p(monthly_rate))
+    closing_balance = principal * (growth[-1] - growth) / growth[-1]
+    opening_balance = np.concatenate(([principal], closing_balance[:-1]))
+    interest = opening_balance * monthly_rate
+    principal_paid = opening_balance - closing_balance
+    
+    # The principal repaid must add up to the loan and the balance never go negative
+    if (closing_balance < 0).any() or not np.isclose(principal_paid.sum(), principal):
+        logger.error(f"Inconsistent amortization schedule for {principal}, {query.rate}%, {tenure} months")
+        return ojsonify({'error': 'Invalid parameters'}), 400
+    
+    schedule = [
+        {
+            'month': month,
             'emi': round(emi, 2),
-            'total_amount': round(total_amount, 2),
-            'total_interest': round(total_interest, 2)
-        })
-    except (ValueError, TypeError) as e:
-        return jsonify({'error': 'Invalid input parameters'}), 400
+            'principal': principal_component,
+            'interest': interest_component,
+            'balance': balance
+        }
+        for month, principal_component, interest_component, balance in zip(
+            range(1, tenure + 1),
+            principal_paid.round(2).tolist(),
+            interest.round(2).tolist(),
+            closing_balance.round(2).tolist()
+        )
+    ]
+    
+    return ojsonify({
+        'emi': round(emi, 2),
+        'total_interest': round(emi * tenure - principal, 2),
+        'schedule': schedule
+    })
 
 if __name__ == '__main__':
     app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
@@ -45,6 +45,13 @@ demo_account_types = [
     (2, 'CURRENT', 5000),
 ]
 
+# Lookup indexes built once from the demo data
+demo_accounts_by_id = {a[0]: a for a in demo_accounts}
+
+# Dropdown choices never change in demo mode
+demo_customers_dropdown = tuple((c[0], f"{c[1]} {c[2]}") for c in demo_customers)
+demo_accounts_dropdown = tuple((a[0], f"{a[1]} ({a[2]})") for a in demo_accounts)
+
 @app.route('/')
 def index():
     """Home page"""
@@ -70,10 +77,9 @@ def add_customer():
 @app.route('/accounts')
 def accounts():
     """Account management page"""
-    customers_for_dropdown = [(c[0], f"{c[1]} {c[2]}") for c in demo_customers]
     return render_template('accounts.html', 
                          accounts=demo_accounts, 
-                         customers=customers_for_dropdown, 
+                         customers=demo_customers_dropdown, 
                          account_types=demo_account_types)
 
 @app.route('/open_account', methods=['POST'])
@@ -90,10 +96,9 @@ def open_account():
 @app.route('/transactions')
 def transactions():
     """Transaction management page"""
-    accounts_for_dropdown = [(a[0], f"{a[1]} ({a[2]})") for a in demo_accounts]
     return render_template('transactions.html', 
                          transactions=demo_transactions, 
-                         accounts=accounts_for_dropdown)
+                         accounts=demo_accounts_dropdown)
 
 @app.route('/deposit', methods=['POST'])
 def deposit():
@@ -131,8 +136,7 @@ def transfer():
 @app.route('/loans')
 def loans():
     """Loan management page"""
-    customers_for_dropdown = [(c[0], f"{c[1]} {c[2]}") for c in demo_customers]
-    return render_template('loans.html', loans=demo_loans, customers=customers_for_dropdown)
+    return render_template('loans.html', loans=demo_loans, customers=demo_customers_dropdown)
 
 @app.route('/apply_loan', methods=['POST'])
 def apply_loan():
@@ -153,10 +157,9 @@ def reports():
 @app.route('/api/account_balance/<int:account_id>')
 def get_account_balance(account_id):
     """API endpoint to get account balance (demo)"""
-    # Find account in demo data
-    for account in demo_accounts:
-        if account[0] == account_id:
-            return jsonify({'balance': account[4]})
+    account = demo_accounts_by_id.get(account_id)
+    if account:
+        return jsonify({'balance': account[4]})
     
     return jsonify({'error': 'Account not found'}), 404
 
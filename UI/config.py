@@ -24,10 +24,26 @@ class Config:
     # Construct DSN
     DB_DSN = f"{DB_HOST}:{DB_PORT}/{DB_SERVICE}"
     
+    # Oracle Client libraries; when set, thick mode is used (needed for databases older than 12.1)
+    ORACLE_CLIENT_LIB = os.environ.get('ORACLE_CLIENT_LIB')
+    
+    # Session Pool Settings
+    POOL_MIN = int(os.environ.get('POOL_MIN') or 4)
+    POOL_MAX = int(os.environ.get('POOL_MAX') or 8)
+    POOL_INCREMENT = int(os.environ.get('POOL_INCREMENT') or 1)
+    POOL_TIMEOUT = int(os.environ.get('POOL_TIMEOUT') or 600)  # idle session timeout in seconds
+    STMT_CACHE_SIZE = int(os.environ.get('STMT_CACHE_SIZE') or 50)  # cached statements per session
+    
     # Application Settings
     ITEMS_PER_PAGE = int(os.environ.get('ITEMS_PER_PAGE') or 20)
+    FETCH_ARRAY_SIZE = int(os.environ.get('FETCH_ARRAY_SIZE') or 500)  # rows per fetch round-trip
     MAX_TRANSACTION_AMOUNT = float(os.environ.get('MAX_TRANSACTION_AMOUNT') or 1000000)
     
+    # Cache Settings
+    STATS_CACHE_TTL = int(os.environ.get('STATS_CACHE_TTL') or 10)  # seconds
+    CUSTOMERS_CACHE_TTL = int(os.environ.get('CUSTOMERS_CACHE_TTL') or 60)  # seconds
+    ACCOUNT_TYPES_CACHE_TTL = int(os.environ.get('ACCOUNT_TYPES_CACHE_TTL') or 3600)  # seconds
+    
     # Security Settings
     SESSION_TIMEOUT = int(os.environ.get('SESSION_TIMEOUT') or 3600)  # 1 hour
     
@@ -0,0 +1,58 @@
+"""
+Banking Management System - Request Schemas
+Author: BMS Development Team
+Description: Validation models for form and query parameters
+"""
+
+from datetime import date
+from pydantic import BaseModel, ConfigDict, Field
+
+class FormModel(BaseModel):
+    """Base model rejecting nan and infinite numbers, which float() would accept"""
+    model_config = ConfigDict(allow_inf_nan=False)
+
+class CustomerIn(FormModel):
+    """New customer form"""
+    first_name: str
+    last_name: str
+    email: str
+    phone: str
+    address: str
+    date_of_birth: date
+
+class AccountIn(FormModel):
+    """Open account form"""
+    customer_id: int
+    account_type_id: int
+    initial_deposit: float
+
+class TransactionIn(FormModel):
+    """Deposit and withdrawal forms"""
+    account_id: int
+    amount: float
+    description: str
+
+class TransferIn(FormModel):
+    """Fund transfer form"""
+    from_account_id: int
+    to_account_id: int
+    amount: float
+    description: str
+
+class LoanIn(FormModel):
+    """Loan application form"""
+    customer_id: int
+    loan_type: str
+    principal_amount: float
+    interest_rate: float
+    tenure_months: int
+
+class LoanQuery(FormModel):
+    """Query parameters of the EMI calculators"""
+    principal: float = Field(gt=0)
+    rate: float = Field(gt=0, le=100)  # annual percentage
+    tenure: int = Field(gt=0, le=999)  # LOANS.tenure_months is NUMBER(3)
+
+def invalid_fields(error):
+    """Get a comma separated list of the fields that failed validation"""
+    return ', '.join(str(e['loc'][0]) for e in error.errors() if e['loc'])
\ No newline at end of file